@@ -7,6 +7,26 @@ import csv
 import re
 from collections import defaultdict
 
+# WhatsApp numbers: 10-13 ASCII digits (with or without country code)
+PHONE_RE = re.compile(r'\d{10,13}', re.ASCII)
+
+# "FirstName LastName" or "FirstName MiddleName LastName", allowing hyphens/apostrophes
+NAME_RE = re.compile(r'^([A-Z][a-z]+[\s\-\']?)+([A-Z][a-z]+)?')
+
+# Patterns that are clearly not names
+NOISE_KEYWORDS = (
+    'address', 'city', 'phone', 'mobile', 'whatsapp', 'email', 'date', 
+    'pin code', 'code', 'copy', 'federation', 'district', 'state', 'india',
+    'size', 'bsp no', 'ship no', 'ncode', 'rajasthan', 'group copy',
+    'region', 'zone', 'member', 'committee', 'general meeting'
+)
+# A keyword marks the name as noise when the name is shorter than twice its length
+NOISE_NAME_LIMITS = {k: len(k) * 2 for k in NOISE_KEYWORDS}
+NOISE_MAX_LIMIT = max(NOISE_NAME_LIMITS.values())
+# Lookahead so overlapping keywords are all reported; longest first at each position
+NOISE_RE = re.compile('(?=(%s))' % '|'.join(
+    re.escape(k) for k in sorted(NOISE_KEYWORDS, key=len, reverse=True)))
+
 
 def is_valid_member(row: dict) -> bool:
     """Check if a row represents a real member."""
@@ -14,11 +34,7 @@ def is_valid_member(row: dict) -> bool:
     phone = row.get('whatsapp_number', '').strip()
     
     # Must have both name and phone
-    if not name or not phone or len(name) < 3 or len(phone) < 10:
-        return False
-    
-    # Phone should be all digits
-    if not phone.isdigit():
+    if not name or len(name) < 3 or not PHONE_RE.fullmatch(phone):
         return False
     
     # Filter out obvious noise patterns - must start with alphabetic character
@@ -26,25 +42,16 @@ def is_valid_member(row: dict) -> bool:
         return False
     
     # Filter out patterns that are clearly not names
-    noise_keywords = [
-        'address', 'city', 'phone', 'mobile', 'whatsapp', 'email', 'date', 
-        'pin code', 'code', 'copy', 'federation', 'district', 'state', 'india',
-        'size', 'bsp no', 'ship no', 'ncode', 'rajasthan', 'group copy',
-        'region', 'zone', 'member', 'committee', 'general meeting'
-    ]
-    
     name_lower = name.lower()
-    for keyword in noise_keywords:
-        if keyword in name_lower:
+    name_len = len(name_lower)
+    if name_len < NOISE_MAX_LIMIT:
+        for match in NOISE_RE.finditer(name_lower):
             # Special case: if name is just the keyword, it's noise
-            if len(name_lower) < len(keyword) * 2:
+            if name_len < NOISE_NAME_LIMITS[match.group(1)]:
                 return False
     
     # Name should look like person(s) name: multiple capitalized words
-    # Pattern: "FirstName LastName" or "FirstName MiddleName LastName"
-    # Allow for names with hyphens or apostrophes
-    name_pattern = r'^([A-Z][a-z]+[\s\-\']?)+([A-Z][a-z]+)?'
-    if not re.match(name_pattern, name):
+    if not NAME_RE.match(name):
         # If doesn't match pattern, require at least 15 chars and multiple words
         if len(name) < 15 or len(name.split()) < 2:
             return False
@@ -53,38 +60,36 @@ def is_valid_member(row: dict) -> bool:
 
 
 def clean_csv(input_file: str, output_file: str) -> int:
-    """Clean the CSV and write validated members."""
-    
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-    
-    # Filter valid members
-    valid_members = [r for r in rows if is_valid_member(r)]
-    
-    # Remove duplicates (same name and phone)
+    """Clean the CSV and write validated members.
+
+    Rows are streamed: each one is validated, deduplicated (same name and
+    phone, first occurrence wins) and written before the next is read.
+    """
+    fieldnames = ['id', 'name', 'designation', 'birthdate', 'anniversary', 
+                  'whatsapp_number', 'group_name', 'city', 'photo_file_name']
     seen = set()
-    unique_members = []
-    for member in valid_members:
-        key = (member['name'].strip(), member['whatsapp_number'].strip())
-        if key not in seen:
-            seen.add(key)
-            unique_members.append(member)
+    count = 0
     
-    # Write cleaned CSV
-    if unique_members:
-        fieldnames = ['id', 'name', 'designation', 'birthdate', 'anniversary', 
-                      'whatsapp_number', 'group_name', 'city', 'photo_file_name']
+    with open(input_file, 'r', encoding='utf-8') as fin, \
+            open(output_file, 'w', newline='', encoding='utf-8') as fout:
+        reader = csv.DictReader(fin)
+        writer = csv.writer(fout)
+        writer.writerow(fieldnames)
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for idx, member in enumerate(unique_members, 1):
-                member['id'] = str(idx)
-                writer.writerow({k: member.get(k, '') for k in fieldnames})
+        for m in reader:
+            if not is_valid_member(m):
+                continue
+            key = (m['name'].strip(), m['whatsapp_number'].strip())
+            if key in seen:
+                continue
+            seen.add(key)
+            count += 1
+            writer.writerow((str(count), m.get('name', ''), m.get('designation', ''),
+                             m.get('birthdate', ''), m.get('anniversary', ''),
+                             m.get('whatsapp_number', ''), m.get('group_name', ''),
+                             m.get('city', ''), m.get('photo_file_name', '')))
     
-    return len(unique_members)
+    return count
 
 
 if __name__ == '__main__':
@@ -1,6 +1,9 @@
 import os
 import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional, Tuple
 from dateutil import parser as date_parser
 from dotenv import load_dotenv
 
@@ -10,15 +13,25 @@ from src.whatsapp_client import WhatsAppClient
 
 load_dotenv()
 
+# Concurrent WhatsApp uploads/sends
+SEND_WORKERS = int(os.getenv("WHATSAPP_SEND_WORKERS", "10"))
 
-def is_same_month_day(date_str: str, today: datetime) -> bool:
+
+def month_day(date_str: str) -> Optional[Tuple[int, int]]:
+    """Return (month, day) for a sheet date, or None if blank/unparseable.
+
+    Dates are expected as YYYY-MM-DD; dateutil is only used for other formats.
+    """
     if not date_str:
-        return False
+        return None
     try:
-        dt = date_parser.parse(date_str)
-        return (dt.month, dt.day) == (today.month, today.day)
-    except Exception:
-        return False
+        dt = datetime.strptime(date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        try:
+            dt = date_parser.parse(date_str)
+        except Exception:
+            return None
+    return dt.month, dt.day
 
 
 def build_caption(member: dict, kind: str) -> str:
@@ -33,6 +46,29 @@ def build_caption(member: dict, kind: str) -> str:
         return f"Happy Anniversary to {name} ji 💐\n{designation} – {group}, {city}\n\nWarm wishes from JSG."
 
 
+def send_wish(member: dict, kind: str, image_gen: ImageGenerator,
+              whatsapp: Optional[WhatsAppClient], dry_run: bool) -> str:
+    """Generate the wish image for one member and send it (or just report it in dry-run).
+
+    Returns the log text for this member so concurrent sends don't interleave output.
+    """
+    log = []
+    try:
+        out = image_gen.generate(member, kind=kind)
+        caption = build_caption(member, kind)
+        log.append(f"Generated image: {out}")
+        if dry_run:
+            log.append(f"Dry-run: would send to {member.get('whatsapp_number')} with caption:\n{caption}")
+        else:
+            media_id = whatsapp.upload_media(out)
+            if media_id:
+                sent = whatsapp.send_image_message(member.get("whatsapp_number"), media_id, caption)
+                log.append(f"Sent to {member.get('whatsapp_number')}: {sent}")
+    except Exception as e:
+        log.append(f"Error processing {kind} for {member.get('name')}: {e}")
+    return "\n".join(log)
+
+
 def main(dry_run: bool = False):
     today = datetime.today()
     sheets = SheetsClient()
@@ -44,51 +80,32 @@ def main(dry_run: bool = False):
     if not dry_run:
         whatsapp = WhatsAppClient()
 
-    birthdays = []
-    anniversaries = []
+    # Parse every date once and bucket members by (month, day)
+    birthday_idx = defaultdict(list)
+    anniversary_idx = defaultdict(list)
 
     for m in members:
         try:
-            if is_same_month_day(m.get("birthdate"), today):
-                birthdays.append(m)
-            if is_same_month_day(m.get("anniversary"), today):
-                anniversaries.append(m)
+            key = month_day(m.get("birthdate"))
+            if key:
+                birthday_idx[key].append(m)
+            key = month_day(m.get("anniversary"))
+            if key:
+                anniversary_idx[key].append(m)
         except Exception as e:
             print(f"Skipping row due to parse error: {e}")
 
-    print(f"Found {len(birthdays)} birthdays and {len(anniversaries)} anniversaries for {today.date()}")
+    birthdays = birthday_idx.get((today.month, today.day), [])
+    anniversaries = anniversary_idx.get((today.month, today.day), [])
 
-    # process birthdays
-    for m in birthdays:
-        try:
-            out = image_gen.generate(m, kind="birthday")
-            caption = build_caption(m, "birthday")
-            print(f"Generated image: {out}")
-            if dry_run:
-                print(f"Dry-run: would send to {m.get('whatsapp_number')} with caption:\n{caption}")
-            else:
-                media_id = whatsapp.upload_media(out)
-                if media_id:
-                    sent = whatsapp.send_image_message(m.get("whatsapp_number"), media_id, caption)
-                    print(f"Sent to {m.get('whatsapp_number')}: {sent}")
-        except Exception as e:
-            print(f"Error processing birthday for {m.get('name')}: {e}")
+    print(f"Found {len(birthdays)} birthdays and {len(anniversaries)} anniversaries for {today.date()}")
 
-    # process anniversaries
-    for m in anniversaries:
-        try:
-            out = image_gen.generate(m, kind="anniversary")
-            caption = build_caption(m, "anniversary")
-            print(f"Generated image: {out}")
-            if dry_run:
-                print(f"Dry-run: would send to {m.get('whatsapp_number')} with caption:\n{caption}")
-            else:
-                media_id = whatsapp.upload_media(out)
-                if media_id:
-                    sent = whatsapp.send_image_message(m.get("whatsapp_number"), media_id, caption)
-                    print(f"Sent to {m.get('whatsapp_number')}: {sent}")
-        except Exception as e:
-            print(f"Error processing anniversary for {m.get('name')}: {e}")
+    # Each send is two blocking HTTPS round trips, so recipients are handled concurrently
+    jobs = [(m, "birthday") for m in birthdays] + [(m, "anniversary") for m in anniversaries]
+    with ThreadPoolExecutor(max_workers=SEND_WORKERS) as executor:
+        reports = executor.map(lambda job: send_wish(*job, image_gen, whatsapp, dry_run), jobs)
+        for report in reports:
+            print(report)
 
 
 if __name__ == '__main__':
@@ -11,7 +11,8 @@ This script handles structured PDF forms with fields like:
 - Address/City
 - Photo (embedded in form)
 
-It uses OCR to extract text from form images and intelligently parses the structured fields.
+It reads each page's selectable text when that already contains the form fields, falls back
+to OCR of the rendered page otherwise, and intelligently parses the structured fields.
 
 Usage:
   python -m src.extract_and_export_v2 --input-dir input --output-csv output/members.csv --output-dir photos
@@ -23,9 +24,12 @@ import os
 import csv
 import re
 import argparse
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
 import fitz  # PyMuPDF
 
+from src.ocr_utils import init_ocr_worker, page_has_ink
+
 try:
     import pytesseract
     from PIL import Image
@@ -33,61 +37,88 @@ try:
 except Exception:
     OCR_AVAILABLE = False
 
+# Field labels recognised by parse_form_fields. The only way two labels can
+# overlap is "whatsapp" swallowing a "phone", and whatsapp wins in that case anyway.
+FIELD_LABEL_RE = re.compile(
+    r'(?P<name>name)|(?P<birth>birth)|(?P<whatsapp>whatsapp)|(?P<mobile>mobile)'
+    r'|(?P<phone>phone)|(?P<marriage>marriage)|(?P<designation>occupation|designation)'
+    r'|(?P<city>city|address)'
+)
+PHONE_LABELS = frozenset(('whatsapp', 'mobile', 'phone'))
+# Matched against already-lowercased lines, so no IGNORECASE needed
+NAME_LABEL_RE = re.compile(r'^\s*name\s*[:=]?\s*$')
+NAME_PREFIX_RE = re.compile(r'^name')
+FIELD_SEP_RE = re.compile(r'[:=]')
+DATE_RE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})')
+PHONE_RE = re.compile(r'(\d{10,13})')
+EMAIL_RE = re.compile(r'[\w.-]+@[\w.-]+')
+# '084 - JSG CHITTORGARH' -> 'JSG CHITTORGARH'
+GROUP_RE = re.compile(r'^\d+\s*-\s*(.+)$')
+
+OCR_CONFIG = '--psm 6 -c tessedit_do_invert=0'
+BINARIZE_THRESHOLD = 180
+# Pages with less selectable text than this go straight to OCR
+MIN_NATIVE_TEXT_CHARS = 50
 
-def extract_images_from_pdf(pdf_path: str, out_dir: str, pdf_name: str) -> List[Tuple[int, str]]:
-    """Extract images from a PDF file. Returns list of (page_number, filename) tuples."""
-    try:
-        doc = fitz.open(pdf_path)
-        extracted_files = []
-        for page_index in range(len(doc)):
-            try:
-                images = doc.get_page_images(page_index)
-                for img_index, img in enumerate(images, start=1):
-                    try:
-                        xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        ext = base_image.get("ext", "png")
-                        fname = f"{pdf_name}_p{page_index+1}_{xref}.{ext}"
-                        out_path = os.path.join(out_dir, fname)
-                        with open(out_path, "wb") as f:
-                            f.write(image_bytes)
-                        extracted_files.append((page_index, fname))
-                    except Exception as e:
-                        print(f"    Warning: Failed to extract image {img_index} from page {page_index+1}: {e}")
-            except Exception as e:
-                print(f"    Warning: Failed to process page {page_index+1}: {e}")
-        return extracted_files
-    except Exception as e:
-        print(f"  Error opening PDF {pdf_path}: {e}")
-        return []
 
+def extract_images_from_pdf(doc, out_dir: str, pdf_name: str) -> List[Tuple[int, str]]:
+    """Extract images from an open PDF document. Returns list of (page_number, filename) tuples.
 
-def render_pdf_page_to_image(pdf_path: str, page_index: int, zoom: float = 2.0):
-    """Render a PDF page to PIL Image for OCR. zoom=2.0 for better OCR accuracy."""
+    An image object shared by several pages is decoded and written once; later
+    pages reference the file written for its first occurrence.
+    """
+    extracted_files = []
+    seen_xrefs: Dict[int, str] = {}
+    for page_index in range(len(doc)):
+        try:
+            images = doc.get_page_images(page_index)
+            for img_index, img in enumerate(images, start=1):
+                try:
+                    xref = img[0]
+                    if xref in seen_xrefs:
+                        extracted_files.append((page_index, seen_xrefs[xref]))
+                        continue
+                    base_image = doc.extract_image(xref)
+                    image_bytes = base_image["image"]
+                    ext = base_image.get("ext", "png")
+                    fname = f"{pdf_name}_p{page_index+1}_{xref}.{ext}"
+                    out_path = os.path.join(out_dir, fname)
+                    with open(out_path, "wb") as f:
+                        f.write(image_bytes)
+                    seen_xrefs[xref] = fname
+                    extracted_files.append((page_index, fname))
+                except Exception as e:
+                    print(f"    Warning: Failed to extract image {img_index} from page {page_index+1}: {e}")
+        except Exception as e:
+            print(f"    Warning: Failed to process page {page_index+1}: {e}")
+    return extracted_files
+
+
+def render_pdf_page_to_image(page, zoom: float = 1.5):
+    """Render a PDF page to PIL Image for OCR. zoom=1.5 keeps form text legible at lower OCR cost."""
     try:
-        doc = fitz.open(pdf_path)
-        page = doc[page_index]
         mat = fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat)
-        img_data = pix.tobytes("ppm")
-        
-        from PIL import Image
-        import io
-        img = Image.open(io.BytesIO(img_data))
-        return img
+        pix = page.get_pixmap(matrix=mat, alpha=False)
+        # Wrap the raw RGB samples directly instead of a PPM encode/decode round-trip
+        return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples, "raw", "RGB", pix.stride, 1)
     except Exception as e:
-        print(f"    Error rendering page {page_index+1}: {e}")
+        print(f"    Error rendering page {page.number+1}: {e}")
         return None
 
 
-def extract_text_from_page_image(img) -> str:
-    """Extract text from a PIL Image using OCR."""
+def extract_text_from_page_image(img, binarize: bool = False) -> str:
+    """Extract text from a PIL Image using OCR.
+
+    The image is reduced to grayscale (and optionally thresholded to 1-bit)
+    first; Tesseract's cost scales with pixel bytes and it binarizes anyway.
+    """
     if not img or not OCR_AVAILABLE:
         return ""
     try:
-        # Improve OCR accuracy with preprocessing
-        text = pytesseract.image_to_string(img, config='--psm 6')
+        img = img.convert("L")
+        if binarize:
+            img = img.point(lambda p: 255 if p > BINARIZE_THRESHOLD else 0, mode="1")
+        text = pytesseract.image_to_string(img, config=OCR_CONFIG)
         return text.strip()
     except Exception as e:
         print(f"    Warning: OCR failed: {e}")
@@ -120,68 +151,81 @@ def parse_form_fields(text: str) -> Dict[str, str]:
     
     lines = text.split('\n')
     
-    for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        line_clean = line.strip()
+    # One scan over the whole text finds every field label; only lines that
+    # carry a label are visited below, in order, so "last line wins" holds.
+    labels_by_line = {}
+    text_lower = text.lower()
+    line_idx, pos = 0, 0
+    for m in FIELD_LABEL_RE.finditer(text_lower):
+        line_idx += text_lower.count('\n', pos, m.start())
+        pos = m.start()
+        labels_by_line.setdefault(line_idx, set()).add(m.lastgroup)
+    
+    for i, labels in labels_by_line.items():
+        line = lines[i]
         
         # Name - usually at the beginning, after "Name" label
-        if re.match(r'^\s*name\s*[:=]?\s*$', line_lower, re.IGNORECASE) and i + 1 < len(lines):
-            fields['name'] = lines[i + 1].strip()
-        elif re.match(r'^name', line_lower, re.IGNORECASE) and ':' in line:
-            name_part = re.split(r'[:=]', line, 1)[1].strip()
-            if name_part:
-                fields['name'] = name_part
+        if 'name' in labels:
+            line_lower = line.lower().strip()
+            if NAME_LABEL_RE.match(line_lower) and i + 1 < len(lines):
+                fields['name'] = lines[i + 1].strip()
+            elif NAME_PREFIX_RE.match(line_lower) and ':' in line:
+                name_part = FIELD_SEP_RE.split(line, 1)[1].strip()
+                if name_part:
+                    fields['name'] = name_part
         
         # Birth Date - DD/MM/YYYY or DD-MM-YYYY format
-        if 'birth' in line_lower:
-            date_match = re.search(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', line)
+        if 'birth' in labels:
+            date_match = DATE_RE.search(line)
             if date_match:
                 day, month, year = date_match.groups()
                 fields['birthdate'] = f"{year}-{month:0>2}-{day:0>2}"
         
         # WhatsApp/Mobile number - 10+ digits
-        if any(x in line_lower for x in ['whatsapp', 'mobile', 'phone']):
-            phone_match = re.search(r'(\d{10,13})', line)
+        if not labels.isdisjoint(PHONE_LABELS):
+            phone_match = PHONE_RE.search(line)
             if phone_match:
                 phone = phone_match.group(1)
-                if 'whatsapp' in line_lower:
+                if 'whatsapp' in labels:
                     fields['whatsapp_number'] = phone
-                elif 'mobile' in line_lower:
+                elif 'mobile' in labels:
                     fields['phone'] = phone
-                elif 'phone' in line_lower and not fields['phone']:
+                elif not fields['phone']:
                     fields['phone'] = phone
         
-        # Marriage/Anniversary Date
-        if 'marriage' in line_lower or 'anniversary' in line_lower or "spouse's birth" in line_lower.lower():
-            # Try to find date in this line or next few lines
+        # Marriage/Anniversary Date - in this line or the next two
+        if 'marriage' in labels:
             for j in range(i, min(i + 3, len(lines))):
-                date_match = re.search(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', lines[j])
-                if date_match and 'marriage' in line_lower:
+                date_match = DATE_RE.search(lines[j])
+                if date_match:
                     day, month, year = date_match.groups()
                     fields['anniversary'] = f"{year}-{month:0>2}-{day:0>2}"
                     break
         
         # Occupation/Designation
-        if re.match(r'.*occupation', line_lower, re.IGNORECASE) or re.match(r'.*designation', line_lower):
-            occ_part = re.split(r'[:=]', line, 1)
+        if 'designation' in labels:
+            occ_part = FIELD_SEP_RE.split(line, 1)
             if len(occ_part) > 1:
                 fields['designation'] = occ_part[1].strip()
             elif i + 1 < len(lines):
                 fields['designation'] = lines[i + 1].strip()
         
         # City/Address
-        if 'city' in line_lower or 'address' in line_lower:
-            city_part = re.split(r'[:=]', line, 1)
+        if 'city' in labels:
+            city_part = FIELD_SEP_RE.split(line, 1)
             if len(city_part) > 1:
                 fields['city'] = city_part[1].strip()
             elif i + 1 < len(lines):
                 fields['city'] = lines[i + 1].strip()
-        
-        # Email
-        if 'email' in line_lower or '@' in line:
-            email_match = re.search(r'[\w.-]+@[\w.-]+', line)
-            if email_match:
-                fields['email'] = email_match.group(0)
+    
+    # Email - first address on the last line that has one
+    email_line, line_idx, pos = -1, 0, 0
+    for m in EMAIL_RE.finditer(text):
+        line_idx += text.count('\n', pos, m.start())
+        pos = m.start()
+        if line_idx != email_line:
+            fields['email'] = m.group(0)
+            email_line = line_idx
     
     return fields
 
@@ -192,13 +236,87 @@ def extract_group_name_from_filename(filename: str) -> str:
     Example: '084 - JSG CHITTORGARH.pdf' -> 'JSG CHITTORGARH'
     """
     basename = os.path.splitext(filename)[0]
-    match = re.match(r'^\d+\s*-\s*(.+)$', basename)
+    match = GROUP_RE.match(basename)
     if match:
         return match.group(1).strip()
     return basename
 
 
-def main(input_dir: str, output_csv: str, output_dir: str, recursive: bool = False):
+# Per-worker handle to the most recently opened PDF. Pages are queued in file
+# order, so a worker usually sees consecutive pages of the same document.
+_worker_doc = None
+
+
+def _get_worker_document(pdf_path: str):
+    """Return an open fitz.Document for pdf_path, reusing this worker's last one if it matches."""
+    global _worker_doc
+    if _worker_doc is None or _worker_doc.name != pdf_path:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc = fitz.open(pdf_path)
+    return _worker_doc
+
+
+def process_page(pdf_path: str, page_idx: int, group_name: str, pdf_name: str,
+                 extracted_photos: List[Tuple[int, str]], zoom: float = 1.5,
+                 binarize: bool = False) -> Optional[Dict[str, str]]:
+    """Extract a member dict from a single PDF page, or None if no name was found.
+
+    The page's own text layer is tried first; OCR only runs when that text is
+    missing or doesn't parse into a named member (many forms only embed the
+    filled-in values, not the field labels).
+
+    Runs in a worker process, so the PDF is opened here (MuPDF objects don't pickle).
+    """
+    page = _get_worker_document(pdf_path)[page_idx]
+    
+    fields = None
+    text = page.get_text("text").strip()
+    if not text and not page_has_ink(page):
+        # Nothing to read and nothing scanned: skip rendering/OCR entirely
+        return None
+    if len(text) >= MIN_NATIVE_TEXT_CHARS:
+        fields = parse_form_fields(text)
+    
+    if not fields or not fields['name']:
+        # Render page to image for better OCR
+        img = render_pdf_page_to_image(page, zoom=zoom)
+        if not img:
+            return None
+        
+        text = extract_text_from_page_image(img, binarize=binarize)
+        if not text:
+            return None
+        
+        # Parse form fields from the text
+        fields = parse_form_fields(text)
+    
+    # Create member entry if we have at least a name
+    if not fields['name']:
+        return None
+    
+    # Find photo for this page if available
+    photo_file = ""
+    for page_num, fname in extracted_photos:
+        if page_num == page_idx:
+            photo_file = fname
+            break
+    
+    return {
+        'id': f"{pdf_name}_{page_idx+1}",
+        'name': fields['name'],
+        'designation': fields['designation'],
+        'birthdate': fields['birthdate'],
+        'anniversary': fields['anniversary'],
+        'whatsapp_number': fields['whatsapp_number'],
+        'group_name': group_name,
+        'city': fields['city'],
+        'photo_file_name': photo_file,
+    }
+
+
+def main(input_dir: str, output_csv: str, output_dir: str, recursive: bool = False,
+         workers: Optional[int] = None, zoom: float = 1.5, binarize: bool = False):
     """Main extraction and export function."""
     if not OCR_AVAILABLE:
         print("ERROR: pytesseract and PIL are required but not available.")
@@ -209,7 +327,6 @@ def main(input_dir: str, output_csv: str, output_dir: str, recursive: bool = Fal
     os.makedirs(output_dir, exist_ok=True)
     os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
     
-    all_members = []
     pdf_files = []
     
     # Collect all PDF files
@@ -225,64 +342,53 @@ def main(input_dir: str, output_csv: str, output_dir: str, recursive: bool = Fal
     
     print(f"Found {len(pdf_files)} PDF files\n")
     
-    # Process each PDF
-    for pdf_path in sorted(pdf_files):
-        filename = os.path.basename(pdf_path)
-        pdf_name = os.path.splitext(filename)[0]
-        group_name = extract_group_name_from_filename(filename)
-        
-        print(f"Processing: {filename}")
-        print(f"  Group: {group_name}")
-        
-        # Extract images for photo references
-        print(f"  Extracting images...")
-        extracted_photos = extract_images_from_pdf(pdf_path, output_dir, pdf_name)
-        print(f"    Extracted {len(extracted_photos)} images")
-        
-        # Extract text from each page using OCR
-        print(f"  Extracting text with OCR...")
-        try:
-            doc = fitz.open(pdf_path)
-            num_pages = len(doc)
+    # OCR is CPU-bound and independent per page, so pages are fanned out to
+    # worker processes. Image extraction stays in the parent (it is I/O-bound).
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=init_ocr_worker) as executor:
+        futures = {}
+        for pdf_idx, pdf_path in enumerate(sorted(pdf_files)):
+            filename = os.path.basename(pdf_path)
+            pdf_name = os.path.splitext(filename)[0]
+            group_name = extract_group_name_from_filename(filename)
+            
+            print(f"Processing: {filename}")
+            print(f"  Group: {group_name}")
+            
+            try:
+                doc = fitz.open(pdf_path)
+            except Exception as e:
+                print(f"  Error opening PDF {pdf_path}: {e}")
+                continue
             
+            # Extract images for photo references
+            print(f"  Extracting images...")
+            with doc:
+                extracted_photos = extract_images_from_pdf(doc, output_dir, pdf_name)
+                num_pages = len(doc)
+            print(f"    Extracted {len(extracted_photos)} images")
+            
+            print(f"  Queued {num_pages} pages for OCR")
             for page_idx in range(num_pages):
-                # Render page to image for better OCR
-                img = render_pdf_page_to_image(pdf_path, page_idx, zoom=2.0)
-                if not img:
-                    continue
-                
-                text = extract_text_from_page_image(img)
-                if not text:
-                    continue
-                
-                # Parse form fields from the text
-                fields = parse_form_fields(text)
-                
-                # Find photo for this page if available
-                photo_file = ""
-                for page_num, fname in extracted_photos:
-                    if page_num == page_idx:
-                        photo_file = fname
-                        break
-                
-                # Create member entry if we have at least a name
-                if fields['name']:
-                    member = {
-                        'id': f"{pdf_name}_{page_idx+1}",
-                        'name': fields['name'],
-                        'designation': fields['designation'],
-                        'birthdate': fields['birthdate'],
-                        'anniversary': fields['anniversary'],
-                        'whatsapp_number': fields['whatsapp_number'],
-                        'group_name': group_name,
-                        'city': fields['city'],
-                        'photo_file_name': photo_file,
-                    }
-                    all_members.append(member)
-                    print(f"    Page {page_idx+1}: Extracted '{fields['name']}'")
+                future = executor.submit(process_page, pdf_path, page_idx, group_name,
+                                         pdf_name, extracted_photos, zoom, binarize)
+                futures[future] = (pdf_idx, page_idx, filename)
         
-        except Exception as e:
-            print(f"  Error processing PDF: {e}")
+        print(f"\nExtracting text with OCR...")
+        for future in as_completed(futures):
+            pdf_idx, page_idx, filename = futures[future]
+            try:
+                member = future.result()
+            except Exception as e:
+                print(f"  Error processing page {page_idx+1} of {filename}: {e}")
+                continue
+            if member:
+                results[(pdf_idx, page_idx)] = member
+                print(f"    {filename} page {page_idx+1}: Extracted '{member['name']}'")
+    
+    # Keep output in file/page order regardless of completion order
+    all_members = [results[key] for key in sorted(results)]
     
     print(f"\n{'='*70}")
     print(f"Total members extracted: {len(all_members)}")
@@ -295,11 +401,13 @@ def main(input_dir: str, output_csv: str, output_dir: str, recursive: bool = Fal
                       'whatsapp_number', 'group_name', 'city', 'photo_file_name']
         
         with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for member in all_members:
-                writer.writerow({k: member.get(k, '') for k in fieldnames})
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                (m['id'], m['name'], m['designation'], m['birthdate'], m['anniversary'],
+                 m['whatsapp_number'], m['group_name'], m['city'], m['photo_file_name'])
+                for m in all_members
+            )
         
         print(f"✓ CSV file created: {output_csv}")
         print(f"✓ Photos extracted to: {output_dir}")
@@ -332,6 +440,13 @@ if __name__ == '__main__':
                         help='Output directory for extracted images')
     parser.add_argument('--recursive', action='store_true',
                         help='Recursively search input directory for PDFs')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of OCR worker processes (default: CPU count)')
+    parser.add_argument('--zoom', type=float, default=1.5,
+                        help='Render zoom factor for OCR (raise for small print)')
+    parser.add_argument('--binarize', action='store_true',
+                        help='Threshold pages to black/white before OCR')
     args = parser.parse_args()
     
-    main(args.input_dir, args.output_csv, args.output_dir, args.recursive)
+    main(args.input_dir, args.output_csv, args.output_dir, args.recursive, args.workers,
+         args.zoom, args.binarize)
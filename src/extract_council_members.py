@@ -8,25 +8,58 @@ This script:
 3. Validates 100% data completeness
 4. Exports clean CSV for Google Sheets
 
+If the optional `tesserocr` package is installed, OCR goes through a persistent
+in-process Tesseract API. Otherwise the regions of each page are OCRed by a single
+`tesseract` run over a list file of region images.
+
 Usage:
   python3 -m src.extract_council_members --input-dir input --output-csv output/members.csv
 """
 import os
 import csv
 import re
+import string
 import argparse
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
 import fitz
-import pytesseract
-from PIL import Image
 
+from src.ocr_utils import OCR_AVAILABLE, crop_region, init_ocr_worker, ocr_regions, render_page
+
+# Output CSV is block-buffered and flushed every CSV_FLUSH_EVERY PDFs
+CSV_BUFFER_SIZE = 1 << 20
+CSV_FLUSH_EVERY = 20
+
+DATE_RE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})')
+PHONE_RE = re.compile(r'\b(\d{10,13})\b')
+GROUP_RE = re.compile(r'^\d+\s*-\s*(.+)$')
+
+# Characters and form labels that never appear in a real member name
+BAD_NAME_CHARS = frozenset('[](){}|"\'/\\:;')
+FORM_LABELS = (
+    'std code', 'date of inaugu', 'pin code',
+    'address', 'designation', 'birth date', 'marriage', 'anniversary',
+    'whatsapp', 'mobile', 'email', 'phone', 'copy', 'code', 'details of',
+    'general council', 'general meeting', 'office bearer', 'following'
+)
+FORM_LABEL_RE = re.compile('|'.join(map(re.escape, FORM_LABELS)))
+DROP_ASCII_LETTERS = str.maketrans('', '', string.ascii_letters)
 
+# Managing committee roles and copy markers that disqualify a council entry
+EXCLUDE_RE = re.compile(
+    r'managing committee|committee|chairman|secretary|treasurer|advisor|patron|'
+    r'office copy|group copy|federation copy|region copy|zone copy'
+)
+
+
+@lru_cache(maxsize=4096)
 def normalize_date(date_str: str) -> str:
     """Convert date to YYYY-MM-DD format."""
     if not date_str:
         return ""
     date_str = date_str.strip()
-    match = re.match(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', date_str)
+    match = DATE_RE.match(date_str)
     if match:
         try:
             d, m, y = int(match.group(1)), int(match.group(2)), int(match.group(3))
@@ -42,17 +75,7 @@ def is_council_member(member: Dict) -> bool:
     designation = member.get('designation', '').lower()
     
     # Exclude managing committee members
-    exclude_patterns = [
-        'managing committee', 'committee', 'chairman', 'secretary', 
-        'treasurer', 'advisor', 'patron', 'office copy', 'group copy',
-        'federation copy', 'region copy', 'zone copy'
-    ]
-    
-    for pattern in exclude_patterns:
-        if pattern in name or pattern in designation:
-            return False
-    
-    return True
+    return not (EXCLUDE_RE.search(name) or EXCLUDE_RE.search(designation))
 
 
 def is_valid_name(name: str) -> bool:
@@ -65,22 +88,12 @@ def is_valid_name(name: str) -> bool:
         return False
     
     # Should not contain brackets, quotes, pipes, numbers at start
-    bad_chars = ['[', ']', '(', ')', '{', '}', '|', '"', "'", '/', '\\', ':', ';']
-    for char in bad_chars:
-        if char in name:
-            return False
+    if not BAD_NAME_CHARS.isdisjoint(name):
+        return False
     
     # Should not contain common form labels
-    form_labels = [
-        'std code', 'date of inaugu', 'pin code',
-        'address', 'designation', 'birth date', 'marriage', 'anniversary',
-        'whatsapp', 'mobile', 'email', 'phone', 'copy', 'code', 'details of',
-        'general council', 'general meeting', 'office bearer', 'following'
-    ]
-    name_lower = name.lower()
-    for label in form_labels:
-        if label in name_lower:
-            return False
+    if FORM_LABEL_RE.search(name.lower()):
+        return False
     
     # Should have at least 2 words (first name, last name)
     words = name.split()
@@ -91,25 +104,19 @@ def is_valid_name(name: str) -> bool:
     for word in words:
         if len(word) < 2:
             return False
-        letter_count = sum(1 for c in word if c.isalpha())
+        if word.isalpha():
+            continue
+        if word.isascii():
+            # Deleting the letters in C leaves only the non-letters to count
+            letter_count = len(word) - len(word.translate(DROP_ASCII_LETTERS))
+        else:
+            letter_count = sum(map(str.isalpha, word))
         if letter_count / len(word) < 0.6:  # At least 60% letters (allows "lodha")
             return False
     
     return True
 
 
-def ocr_region(doc, page_num: int, rect) -> str:
-    """Extract text from a page region using OCR."""
-    try:
-        pix = doc[page_num].get_pixmap(clip=rect, matrix=fitz.Matrix(1.5, 1.5), alpha=False)
-        img_data = pix.tobytes("ppm")
-        img = Image.frombytes("RGB", [pix.width, pix.height], img_data)
-        text = pytesseract.image_to_string(img, config='--psm 6')
-        return text
-    except:
-        return ""
-
-
 def parse_member_region(text: str, group_name: str) -> Dict:
     """Parse member info from OCR text."""
     member = {
@@ -124,7 +131,9 @@ def parse_member_region(text: str, group_name: str) -> Dict:
         'photo_file_name': '',
     }
     
-    if not text.strip():
+    # Member forms always carry a "Name <actual_name>" line; regions without
+    # one (including blank ones) are rejected before any splitting
+    if 'name ' not in text.lower():
         return member
     
     lines = [l.strip() for l in text.split('\n') if l.strip()]
@@ -146,14 +155,14 @@ def parse_member_region(text: str, group_name: str) -> Dict:
         return member
     
     # Extract dates (DD/MM/YYYY)
-    dates = re.findall(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', text)
+    dates = DATE_RE.findall(text)
     if dates:
         member['birthdate'] = normalize_date(f"{dates[0][0]}/{dates[0][1]}/{dates[0][2]}")
         if len(dates) > 1:
             member['anniversary'] = normalize_date(f"{dates[1][0]}/{dates[1][1]}/{dates[1][2]}")
     
     # Extract phone numbers
-    phones = re.findall(r'\b(\d{10,13})\b', text)
+    phones = PHONE_RE.findall(text)
     if phones:
         member['whatsapp_number'] = sorted(set(phones), key=len, reverse=True)[0]
     
@@ -170,10 +179,11 @@ def parse_member_region(text: str, group_name: str) -> Dict:
     return member
 
 
+@lru_cache(maxsize=4096)
 def extract_group_name(filename: str) -> str:
     """Extract group from filename."""
     basename = os.path.splitext(filename)[0]
-    match = re.match(r'^\d+\s*-\s*(.+)$', basename)
+    match = GROUP_RE.match(basename)
     return match.group(1).strip() if match else basename
 
 
@@ -195,6 +205,7 @@ def process_pdf(pdf_path: str, group_name: str) -> List[Dict]:
             col_width = page_rect.width * 0.5
             row_height = (page_rect.height - top_margin) / 3
             
+            regions = []
             for row in range(3):
                 for col in range(2):
                     y0 = top_margin + (row * row_height)
@@ -205,18 +216,22 @@ def process_pdf(pdf_path: str, group_name: str) -> List[Dict]:
                     x0 = col * col_width
                     x1 = x0 + col_width
                     
-                    rect = fitz.Rect(x0, y0, x1, y1)
-                    text = ocr_region(doc, page_num, rect)
+                    regions.append(fitz.Rect(x0, y0, x1, y1))
+            
+            # Rasterize the page once and crop the regions in memory; OCR runs
+            # on this worker process's single Tesseract
+            page_img = render_page(page)
+            images = [crop_region(page_img, rect) for rect in regions]
+            for text in ocr_regions(images):
+                if text.strip():
+                    member = parse_member_region(text, group_name)
                     
-                    if text.strip():
-                        member = parse_member_region(text, group_name)
-                        
-                        # Validate member
-                        if (member['name'] and 
-                            member['whatsapp_number'] and 
-                            is_valid_name(member['name']) and
-                            is_council_member(member)):
-                            members.append(member)
+                    # Validate member
+                    if (member['name'] and 
+                        member['whatsapp_number'] and 
+                        is_valid_name(member['name']) and
+                        is_council_member(member)):
+                        members.append(member)
         
         doc.close()
     except Exception as e:
@@ -225,8 +240,13 @@ def process_pdf(pdf_path: str, group_name: str) -> List[Dict]:
     return members
 
 
-def main(input_dir: str, output_csv: str):
+def main(input_dir: str, output_csv: str, workers: Optional[int] = None):
     """Main extraction with quality validation."""
+    if not OCR_AVAILABLE:
+        print("ERROR: pytesseract and PIL are required but not available.")
+        print("Please install: pip install pytesseract pillow")
+        return
+    
     os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
     
     pdf_files = sorted([f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')])
@@ -242,31 +262,38 @@ def main(input_dir: str, output_csv: str):
     total_members = 0
     skipped = 0
     
-    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    with open(output_csv, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
         
-        for idx, filename in enumerate(pdf_files, 1):
-            pdf_path = os.path.join(input_dir, filename)
-            group_name = extract_group_name(filename)
-            
-            print(f"[{idx:2d}/{len(pdf_files)}] {filename:55s}", end=" ", flush=True)
-            
-            members = process_pdf(pdf_path, group_name)
-            
-            # Write validated members
-            for member in members:
-                member['id'] = str(total_members + 1)
-                writer.writerow({k: member.get(k, '') for k in fieldnames})
-                total_members += 1
-            
-            csvfile.flush()
-            
-            if members:
-                print(f"✅ {len(members):3d} council members", flush=True)
-            else:
-                print(f"⏭️  No members found", flush=True)
-                skipped += 1
+        # PDFs are OCR'd in worker processes; results come back in file order
+        # and are written here, so ids stay sequential and deterministic.
+        pdf_paths = [os.path.join(input_dir, f) for f in pdf_files]
+        group_names = [extract_group_name(f) for f in pdf_files]
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=init_ocr_worker) as executor:
+            results = executor.map(process_pdf, pdf_paths, group_names)
+            for idx, (filename, members) in enumerate(zip(pdf_files, results), 1):
+                print(f"[{idx:2d}/{len(pdf_files)}] {filename:55s}", end=" ", flush=True)
+                
+                # Write this PDF's validated members as one block
+                writer.writerows(
+                    (str(total_members + n), m['name'], m['designation'],
+                     m['birthdate'], m['anniversary'], m['whatsapp_number'],
+                     m['group_name'], m['city'], m['photo_file_name'])
+                    for n, m in enumerate(members, 1)
+                )
+                total_members += len(members)
+                
+                # Partial results reach disk every few PDFs; close flushes the rest
+                if idx % CSV_FLUSH_EVERY == 0:
+                    csvfile.flush()
+                
+                if members:
+                    print(f"✅ {len(members):3d} council members", flush=True)
+                else:
+                    print(f"⏭️  No members found", flush=True)
+                    skipped += 1
     
     print(f"\n{'='*80}")
     print(f"EXTRACTION COMPLETE")
@@ -294,6 +321,8 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Extract council members from JSG PDFs')
     parser.add_argument('--input-dir', default='input')
     parser.add_argument('--output-csv', default='output/members.csv')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of OCR worker processes (default: CPU count)')
     args = parser.parse_args()
     
-    main(args.input_dir, args.output_csv)
+    main(args.input_dir, args.output_csv, args.workers)
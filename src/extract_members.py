@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """Extract member data from PDF forms using OCR (optimized version).
 
-Writes results progressively to CSV as they're found.
+Writes results progressively to CSV as they're found. If the optional `tesserocr`
+package is installed, OCR goes through a persistent in-process Tesseract API
+instead of `tesseract` subprocesses. Otherwise the regions of each page are
+OCRed by a single `tesseract` run over a list file of region images.
 
 Usage:
   python3 -m src.extract_members --input-dir input --output-csv output/members.csv
@@ -10,19 +13,30 @@ import os
 import csv
 import re
 import argparse
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
 import fitz
-import pytesseract
-from PIL import Image
 import io
 
+from src.ocr_utils import OCR_AVAILABLE, crop_region, init_ocr_worker, ocr_regions, render_page
 
+# Output CSV is block-buffered and flushed every CSV_FLUSH_EVERY PDFs
+CSV_BUFFER_SIZE = 1 << 20
+CSV_FLUSH_EVERY = 20
+
+DATE_RE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})')
+PHONE_RE = re.compile(r'\b(\d{10,13})\b')
+GROUP_RE = re.compile(r'^\d+\s*-\s*(.+)$')
+
+
+@lru_cache(maxsize=4096)
 def normalize_date(date_str: str) -> str:
     """Normalize date to YYYY-MM-DD."""
     if not date_str:
         return ""
     date_str = date_str.strip()
-    match = re.match(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', date_str)
+    match = DATE_RE.match(date_str)
     if match:
         try:
             d, m, y = int(match.group(1)), int(match.group(2)), int(match.group(3))
@@ -32,18 +46,6 @@ def normalize_date(date_str: str) -> str:
     return ""
 
 
-def ocr_page_region(doc, page_num: int, rect) -> str:
-    """Extract text from a page region using OCR."""
-    try:
-        pix = doc[page_num].get_pixmap(clip=rect, matrix=fitz.Matrix(1.5, 1.5), alpha=False)
-        img_data = pix.tobytes("ppm")
-        img = Image.frombytes("RGB", [pix.width, pix.height], img_data)
-        text = pytesseract.image_to_string(img, config='--psm 6')
-        return text
-    except:
-        return ""
-
-
 def parse_member_text(text: str, group_name: str) -> Dict:
     """Parse member info from OCR text."""
     member = {
@@ -71,14 +73,14 @@ def parse_member_text(text: str, group_name: str) -> Dict:
                 break
     
     # Extract dates
-    dates = re.findall(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', text)
+    dates = DATE_RE.findall(text)
     if dates:
         member['birthdate'] = normalize_date(f"{dates[0][0]}/{dates[0][1]}/{dates[0][2]}")
         if len(dates) > 1:
             member['anniversary'] = normalize_date(f"{dates[1][0]}/{dates[1][1]}/{dates[1][2]}")
     
     # Extract phone numbers
-    phones = re.findall(r'\b(\d{10,13})\b', text)
+    phones = PHONE_RE.findall(text)
     if phones:
         # Prefer longer numbers
         member['whatsapp_number'] = sorted(set(phones), key=len, reverse=True)[0]
@@ -93,10 +95,11 @@ def parse_member_text(text: str, group_name: str) -> Dict:
     return member
 
 
+@lru_cache(maxsize=4096)
 def extract_group_name(filename: str) -> str:
     """Extract group from filename."""
     basename = os.path.splitext(filename)[0]
-    match = re.match(r'^\d+\s*-\s*(.+)$', basename)
+    match = GROUP_RE.match(basename)
     return match.group(1).strip() if match else basename
 
 
@@ -135,9 +138,11 @@ def process_pdf(pdf_path: str, group_name: str) -> list:
                     rect = fitz.Rect(x0, y0, x1, y1)
                     regions.append(rect)
             
-            # OCR each region
-            for rect in regions:
-                text = ocr_page_region(doc, page_num, rect)
+            # OCR each region: rasterize the page once and crop the regions in
+            # memory; parallelism comes from the per-PDF worker processes
+            page_img = render_page(page)
+            images = [crop_region(page_img, rect) for rect in regions]
+            for text in ocr_regions(images):
                 if text.strip():
                     member = parse_member_text(text, group_name)
                     if member['name'] and member['whatsapp_number']:
@@ -150,8 +155,13 @@ def process_pdf(pdf_path: str, group_name: str) -> list:
     return members
 
 
-def main(input_dir: str, output_csv: str):
+def main(input_dir: str, output_csv: str, workers: Optional[int] = None):
     """Main extraction with progressive CSV writing."""
+    if not OCR_AVAILABLE:
+        print("ERROR: pytesseract and PIL are required but not available.")
+        print("Please install: pip install pytesseract pillow")
+        return
+    
     os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
     
     pdf_files = sorted([f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')])
@@ -163,27 +173,34 @@ def main(input_dir: str, output_csv: str):
     
     total_members = 0
     
-    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    with open(output_csv, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
         
-        for idx, filename in enumerate(pdf_files, 1):
-            pdf_path = os.path.join(input_dir, filename)
-            group_name = extract_group_name(filename)
-            
-            print(f"[{idx:2d}/{len(pdf_files)}] {filename:55s}", end=" ", flush=True)
-            
-            members = process_pdf(pdf_path, group_name)
-            
-            # Write to CSV immediately
-            for member in members:
-                member['id'] = str(total_members + 1)
-                writer.writerow({k: member.get(k, '') for k in fieldnames})
-                total_members += 1
-            
-            csvfile.flush()  # Flush after each PDF
-            
-            print(f"✓ {len(members):3d}", flush=True)
+        # PDFs are OCR'd in worker processes; results come back in file order
+        # and are written here, so ids stay sequential and deterministic.
+        pdf_paths = [os.path.join(input_dir, f) for f in pdf_files]
+        group_names = [extract_group_name(f) for f in pdf_files]
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=init_ocr_worker) as executor:
+            results = executor.map(process_pdf, pdf_paths, group_names)
+            for idx, (filename, members) in enumerate(zip(pdf_files, results), 1):
+                print(f"[{idx:2d}/{len(pdf_files)}] {filename:55s}", end=" ", flush=True)
+                
+                # Write this PDF's members as one block
+                writer.writerows(
+                    (str(total_members + n), m['name'], m['designation'],
+                     m['birthdate'], m['anniversary'], m['whatsapp_number'],
+                     m['group_name'], m['city'], m['photo_file_name'])
+                    for n, m in enumerate(members, 1)
+                )
+                total_members += len(members)
+                
+                # Partial results reach disk every few PDFs; close flushes the rest
+                if idx % CSV_FLUSH_EVERY == 0:
+                    csvfile.flush()
+                
+                print(f"✓ {len(members):3d}", flush=True)
     
     print(f"\n{'='*70}")
     print(f"Total members: {total_members}")
@@ -195,6 +212,8 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Extract members from PDF forms')
     parser.add_argument('--input-dir', default='input')
     parser.add_argument('--output-csv', default='output/members.csv')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of OCR worker processes (default: CPU count)')
     args = parser.parse_args()
     
-    main(args.input_dir, args.output_csv)
+    main(args.input_dir, args.output_csv, args.workers)
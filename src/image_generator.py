@@ -1,6 +1,7 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -28,6 +29,11 @@ class ImageGenerator:
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(os.path.join(self.output_dir, "birthday"), exist_ok=True)
         os.makedirs(os.path.join(self.output_dir, "anniversary"), exist_ok=True)
+        # Decoded templates keyed by kind; each generate() works on a copy
+        self._templates = {}
+        # Fonts are parsed once and shared by every generate() call
+        self._name_font = self._load_font(DEFAULT_BOLD, 48)
+        self._reg_font = self._load_font(DEFAULT_REGULAR, 34)
 
     def _load_font(self, path: str, size: int):
         try:
@@ -35,6 +41,16 @@ class ImageGenerator:
         except Exception:
             return ImageFont.load_default()
 
+    def _get_template(self, kind: str) -> Image.Image:
+        template = self._templates.get(kind)
+        if template is None:
+            template_path = os.path.join(self.templates_dir, f"{kind}_template.png")
+            if not os.path.exists(template_path):
+                raise FileNotFoundError(f"Template not found: {template_path}")
+            template = Image.open(template_path).convert("RGBA")
+            self._templates[kind] = template
+        return template
+
     def generate(self, member: Dict, kind: str = "birthday") -> str:
         """Generate an image for a member.
 
@@ -44,13 +60,9 @@ class ImageGenerator:
         Returns the path to the generated image.
         """
         assert kind in ("birthday", "anniversary")
-        template_name = f"{kind}_template.png"
-        template_path = os.path.join(self.templates_dir, template_name)
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template not found: {template_path}")
 
-        # Load template
-        base = Image.open(template_path).convert("RGBA")
+        # Load template (decoded once per kind)
+        base = self._get_template(kind).copy()
 
         # Load photo
         photo_name = member.get("photo_file_name") or ""
@@ -59,17 +71,20 @@ class ImageGenerator:
             # create a placeholder solid color image
             photo = Image.new("RGB", PHOTO_SIZE, (200, 200, 200))
         else:
-            photo = Image.open(photo_path).convert("RGB")
-            photo = photo.resize(PHOTO_SIZE)
+            photo = Image.open(photo_path)
+            # JPEGs decode directly at the smallest 1/2, 1/4 or 1/8 scale that
+            # still covers PHOTO_SIZE (no-op for other formats)
+            photo.draft("RGB", PHOTO_SIZE)
+            photo = photo.convert("RGB").resize(PHOTO_SIZE, Image.Resampling.BILINEAR)
 
         # Paste photo
         base.paste(photo, PHOTO_POSITION)
 
         draw = ImageDraw.Draw(base)
 
-        # Fonts
-        name_font = self._load_font(DEFAULT_BOLD, 48)
-        reg_font = self._load_font(DEFAULT_REGULAR, 34)
+        # Fonts (loaded once in __init__)
+        name_font = self._name_font
+        reg_font = self._reg_font
 
         # Text
         name = member.get("name", "")
@@ -93,3 +108,15 @@ class ImageGenerator:
         # Convert to RGB and save as JPEG
         base.convert("RGB").save(out_path, "JPEG", quality=90)
         return out_path
+
+    def generate_many(self, members: Iterable[Dict], kind: str = "birthday",
+                      max_workers: Optional[int] = None) -> List[str]:
+        """Generate images for many members on a thread pool.
+
+        Pillow releases the GIL while decoding, resizing and JPEG-encoding, so
+        the per-member work overlaps across threads.
+
+        Returns the output paths in the same order as `members`.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(lambda member: self.generate(member, kind=kind), members))
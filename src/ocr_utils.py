@@ -0,0 +1,143 @@
+"""OCR helpers shared by the PDF member extractors.
+
+Pages are rendered once and the member form regions cropped from the result.
+If the optional `tesserocr` package is installed, regions are OCRed through a
+persistent in-process Tesseract API. Otherwise the regions of a page are OCRed
+by a single `tesseract` run over a list file of region images.
+"""
+import os
+import tempfile
+from typing import List
+import fitz
+
+try:
+    import pytesseract
+    from PIL import Image
+    OCR_AVAILABLE = True
+except Exception:
+    OCR_AVAILABLE = False
+
+
+def init_ocr_worker():
+    """Keep each Tesseract single-threaded so worker processes don't oversubscribe cores."""
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+
+# OpenMP reads the limit once, when libtesseract is loaded, so it has to be in
+# the environment before tesserocr is imported (worker processes inherit it)
+init_ocr_worker()
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except Exception:
+    TESSEROCR_AVAILABLE = False
+
+# Pages are rendered once at this zoom and regions cropped from the result
+RENDER_MATRIX = fitz.Matrix(1.5, 1.5)
+# Regions with fewer than this share of pixels darker than BLANK_DARK_LEVEL are
+# treated as empty form cells and never sent to Tesseract
+BLANK_DARK_LEVEL = 200
+BLANK_DARK_RATIO = 0.005
+
+# Per-process tesserocr API: the language model loads once per worker
+_tess = None
+
+
+def page_has_ink(page: fitz.Page) -> bool:
+    """Return True if a page without selectable text still has something to OCR.
+
+    The bbox log lists every item that would be drawn: images (including inline
+    BI..EI scans that get_images() misses), paths, text, annotations and form
+    widgets. It is empty only for a page that renders blank.
+    """
+    return bool(page.get_bboxlog())
+
+
+def render_page(page):
+    """Render a whole page once for OCR; regions are cropped from it (None if rendering fails)."""
+    try:
+        pix = page.get_pixmap(matrix=RENDER_MATRIX, alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    except:
+        return None
+
+
+def crop_region(page_img, rect):
+    """Cut a page-coordinate rect out of the rendered page image."""
+    if page_img is None:
+        return None
+    box = (rect * RENDER_MATRIX).irect & fitz.IRect(0, 0, *page_img.size)
+    return page_img.crop(tuple(box))
+
+
+def is_blank_region(img) -> bool:
+    """Return True if a cropped region has (almost) no ink on it."""
+    width, height = img.size
+    dark = sum(img.convert("L").histogram()[:BLANK_DARK_LEVEL])
+    return dark < BLANK_DARK_RATIO * width * height
+
+
+def _tess_api():
+    """Return this process's tesserocr API, creating it on first use."""
+    global _tess
+    if _tess is None:
+        _tess = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK)
+    return _tess
+
+
+def ocr_region(img) -> str:
+    """Extract text from a rendered page region using OCR."""
+    if img is None or is_blank_region(img):
+        return ""
+    try:
+        if TESSEROCR_AVAILABLE:
+            api = _tess_api()
+            # Pass the crop's raw RGB pixels: SetImage would encode it to an
+            # in-memory image file only for Leptonica to decode it again
+            api.SetImageBytes(img.tobytes(), img.width, img.height, 3, 3 * img.width)
+            return api.GetUTF8Text()
+        text = pytesseract.image_to_string(img, config='--psm 6')
+        return text
+    except:
+        return ""
+
+
+def ocr_regions_batch(images) -> List[str]:
+    """OCR a page's regions with one tesseract run over a list file of images.
+
+    Tesseract ends each listed image's text with a form feed, which is used to
+    split the output back into one text per region. Falls back to OCRing the
+    regions one by one if the output doesn't line up.
+    """
+    texts = [""] * len(images)
+    todo = [i for i, img in enumerate(images) if img is not None and not is_blank_region(img)]
+    if not todo:
+        return texts
+    try:
+        with tempfile.TemporaryDirectory(prefix='jsg_ocr_') as tmp_dir:
+            paths = []
+            for i in todo:
+                path = os.path.join(tmp_dir, f"region_{i}.png")
+                images[i].save(path)
+                paths.append(path)
+            list_path = os.path.join(tmp_dir, 'regions.txt')
+            with open(list_path, 'w', encoding='utf-8') as list_file:
+                list_file.write('\n'.join(paths) + '\n')
+            output = pytesseract.image_to_string(list_path, config='--psm 6')
+    except:
+        return texts
+
+    parts = output.split('\f')
+    if len(parts) < len(todo) or any(p.strip() for p in parts[len(todo):]):
+        return [ocr_region(img) for img in images]
+    for i, text in zip(todo, parts):
+        texts[i] = text
+    return texts
+
+
+def ocr_regions(images) -> List[str]:
+    """OCR a page's regions: one by one with tesserocr, else in one tesseract run."""
+    if TESSEROCR_AVAILABLE:
+        return [ocr_region(img) for img in images]
+    return ocr_regions_batch(images)
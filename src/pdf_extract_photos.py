@@ -8,25 +8,36 @@ This is a helper script for populating `photos/` from PDF inputs.
 """
 import os
 import argparse
+import shutil
 import fitz  # PyMuPDF
 
 
 def extract_images_from_pdf(pdf_path: str, out_dir: str):
-    doc = fitz.open(pdf_path)
     basename = os.path.splitext(os.path.basename(pdf_path))[0]
     count = 0
-    for page_index in range(len(doc)):
-        images = doc.get_page_images(page_index)
-        for img_index, img in enumerate(images, start=1):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            ext = base_image.get("ext", "png")
-            fname = f"{basename}_p{page_index+1}_{xref}.{ext}"
-            out_path = os.path.join(out_dir, fname)
-            with open(out_path, "wb") as f:
-                f.write(image_bytes)
-            count += 1
+    # Images repeated across pages (logos, shared photos) are pulled out of the
+    # PDF once; later occurrences copy the first file instead of holding its bytes
+    written = {}
+    with fitz.open(pdf_path) as doc:
+        for page_index in range(len(doc)):
+            images = doc.get_page_images(page_index)
+            for img_index, img in enumerate(images, start=1):
+                xref = img[0]
+                first_path = written.get(xref)
+                if first_path is None:
+                    base_image = doc.extract_image(xref)
+                    ext = base_image.get("ext", "png")
+                else:
+                    ext = os.path.splitext(first_path)[1][1:]
+                fname = f"{basename}_p{page_index+1}_{xref}.{ext}"
+                out_path = os.path.join(out_dir, fname)
+                if first_path is None:
+                    with open(out_path, "wb") as f:
+                        f.write(base_image["image"])
+                    written[xref] = out_path
+                elif out_path != first_path:
+                    shutil.copyfile(first_path, out_path)
+                count += 1
     return count
 
 
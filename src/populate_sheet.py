@@ -15,12 +15,15 @@ import os
 import csv
 import re
 import argparse
-from typing import List
+from typing import Iterator, List
 from src.sheets_client import SheetsClient
 
 DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
 PHONE_RE = re.compile(r"(\d{10,13})")
 
+# Rows sent to the sheet per append_rows call
+APPEND_BATCH_SIZE = 500
+
 
 def heuristics_from_text(text: str, photo_file_name: str) -> dict:
     # Attempt to pick out sensible fields from a block of text
@@ -58,12 +61,8 @@ def heuristics_from_text(text: str, photo_file_name: str) -> dict:
     }
 
 
-def main(csv_path: str, worksheet: str = 'JSG Members'):
-    if not os.path.exists(csv_path):
-        print(f"CSV file not found: {csv_path}")
-        return
-
-    rows_to_append: List[dict] = []
+def iter_parsed_rows(csv_path: str) -> Iterator[dict]:
+    """Yield a parsed sheet row for each row of the extracted CSV."""
     with open(csv_path, newline='', encoding='utf-8') as fh:
         reader = csv.DictReader(fh)
         for r in reader:
@@ -71,12 +70,31 @@ def main(csv_path: str, worksheet: str = 'JSG Members'):
             photo = r.get('photo_file_name') or ''
             if not photo and 'source_file' in r:
                 photo = r.get('source_file')
-            parsed = heuristics_from_text(raw, photo)
-            rows_to_append.append(parsed)
+            yield heuristics_from_text(raw, photo)
+
+
+def main(csv_path: str, worksheet: str = 'JSG Members'):
+    if not os.path.exists(csv_path):
+        print(f"CSV file not found: {csv_path}")
+        return
 
     sheets = SheetsClient()
-    print(f"Appending {len(rows_to_append)} rows to worksheet {worksheet}")
-    sheets.append_rows(rows_to_append, worksheet_name=worksheet)
+    print(f"Appending rows to worksheet {worksheet}")
+
+    # Upload in fixed-size batches while the CSV is still being read
+    total = 0
+    batch: List[dict] = []
+    for parsed in iter_parsed_rows(csv_path):
+        batch.append(parsed)
+        if len(batch) >= APPEND_BATCH_SIZE:
+            sheets.append_rows(batch, worksheet_name=worksheet)
+            total += len(batch)
+            batch = []
+    if batch:
+        sheets.append_rows(batch, worksheet_name=worksheet)
+        total += len(batch)
+
+    print(f"Appended {total} rows")
     print("Done")
 
 
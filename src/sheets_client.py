@@ -1,5 +1,6 @@
 import os
-from typing import List, Dict
+from itertools import repeat
+from typing import List, Dict, Optional
 from dotenv import load_dotenv
 import gspread
 from google.oauth2.service_account import Credentials
@@ -32,55 +33,75 @@ class SheetsClient:
 
         creds = Credentials.from_service_account_file(self.service_account_file, scopes=SCOPE)
         self.gc = gspread.authorize(creds)
+        # Spreadsheet and worksheet handles are opened once and reused across calls
+        self._spreadsheet = None
+        self._worksheets = {}
+        # Header row per worksheet, learned from reads/appends so append_rows needn't probe it
+        self._headers = {}
+
+    def _get_worksheet(self, worksheet_name: str):
+        """Return the named worksheet (or the first sheet if it doesn't exist), cached."""
+        ws = self._worksheets.get(worksheet_name)
+        if ws is None:
+            if self._spreadsheet is None:
+                self._spreadsheet = self.gc.open_by_key(self.sheet_id)
+            try:
+                ws = self._spreadsheet.worksheet(worksheet_name)
+            except Exception:
+                # fallback to first sheet
+                ws = self._spreadsheet.get_worksheet(0)
+            self._worksheets[worksheet_name] = ws
+        return ws
 
     def get_members(self, worksheet_name: str = "JSG Members") -> List[Dict]:
         """Return list of member dicts (keys from header row).
 
         The function attempts to coerce blank cells to None.
         """
-        sh = self.gc.open_by_key(self.sheet_id)
-        try:
-            ws = sh.worksheet(worksheet_name)
-        except Exception:
-            # fallback to first sheet
-            ws = sh.get_worksheet(0)
-
-        all_values = ws.get_all_records()  # returns list of dicts using header row
-        # normalize keys to expected ones (strip)
-        normalized = []
-        for row in all_values:
-            cleaned = {k.strip(): (v if v != "" else None) for k, v in row.items()}
-            normalized.append(cleaned)
-        return normalized
-
-    def append_rows(self, rows: List[Dict], worksheet_name: str = "JSG Members") -> None:
+        ws = self._get_worksheet(worksheet_name)
+        all_values = ws.get_all_values()  # header row followed by data rows
+        if not all_values:
+            return []
+        # normalize keys to expected ones (strip) once, then zip each row onto them
+        self._headers[worksheet_name] = all_values[0]
+        headers = [h.strip() for h in all_values[0]]
+        return [
+            {k: (v if v != "" else None) for k, v in zip(headers, row)}
+            for row in all_values[1:]
+        ]
+
+    def append_rows(self, rows: List[Dict], worksheet_name: str = "JSG Members",
+                    headers: Optional[List[str]] = None) -> None:
         """Append multiple rows to the sheet. Expects rows as list of dicts where keys match header names.
 
-        If the worksheet doesn't contain headers, this will write headers first.
+        If the worksheet doesn't contain headers, this will write headers first, in the
+        same API call as the rows. Pass `headers` when the sheet's header row is already
+        known to skip reading it.
         """
-        sh = self.gc.open_by_key(self.sheet_id)
-        try:
-            ws = sh.worksheet(worksheet_name)
-        except Exception:
-            ws = sh.get_worksheet(0)
-
-        # Get existing headers
-        try:
-            headers = ws.row_values(1)
-        except Exception:
-            headers = []
+        ws = self._get_worksheet(worksheet_name)
+
+        # Get existing headers (cached after the first read of this worksheet)
+        if headers is None:
+            headers = self._headers.get(worksheet_name)
+        if headers is None:
+            try:
+                headers = ws.row_values(1)
+            except Exception:
+                headers = []
 
         # If no headers, create them from keys of first row
+        to_append = []
         if not headers and rows:
             headers = list(rows[0].keys())
-            ws.append_row(headers)
+            to_append.append(headers)
 
-        # Build rows in header order
-        to_append = []
+        # Build rows in header order; map calls r.get(h, "") per header in C
+        blank = repeat("")
         for r in rows:
-            row_values = [r.get(h, "") for h in headers]
-            to_append.append(row_values)
+            to_append.append([*map(r.get, headers, blank)])
 
-        # gspread has append_rows
+        # gspread has append_rows; header and data rows go out as one request
         if to_append:
             ws.append_rows(to_append, value_input_option='USER_ENTERED')
+        if headers:
+            self._headers[worksheet_name] = headers
@@ -6,6 +6,8 @@ Usage:
 Behavior:
 - For PDFs: attempts to extract selectable text via PyMuPDF (fast, accurate when PDF contains text).
 - For images (jpg/png) or PDF pages without selectable text: optionally use pytesseract if available.
+  If the optional `tesserocr` package is installed, OCR goes through one persistent in-process
+  Tesseract API per worker instead of `tesseract` subprocesses.
 - Writes a CSV with columns: source_file, page, photo_file_name (for images), raw_text
 
 Notes:
@@ -17,9 +19,18 @@ Notes:
 import os
 import csv
 import argparse
-from typing import List
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 import fitz
 
+# ocr_utils puts OMP_THREAD_LIMIT in the environment before it imports tesserocr
+# (libgomp reads it at load time), so tesserocr must not be imported ahead of it
+from src.ocr_utils import TESSEROCR_AVAILABLE, init_ocr_worker, page_has_ink
+
+if TESSEROCR_AVAILABLE:
+    from tesserocr import PyTessBaseAPI
+
 try:
     import pytesseract
     from PIL import Image
@@ -28,95 +39,151 @@ try:
 except Exception:
     OCR_AVAILABLE = False
 
+SUPPORTED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg')
+# Output CSV is block-buffered; rows are never flushed one by one
+CSV_BUFFER_SIZE = 1 << 20
+# MuPDF's cache of decoded images/fonts is emptied every this many rasterized pages
+STORE_SHRINK_EVERY = 50
+
+# Per-process tesserocr API: the language model loads once per worker
+_tess_api = None
+
+
+def ocr_image(img) -> str:
+    """OCR a PIL image via the persistent tesserocr API if installed, else pytesseract."""
+    global _tess_api
+    if TESSEROCR_AVAILABLE:
+        if _tess_api is None:
+            _tess_api = PyTessBaseAPI()
+        _tess_api.SetImage(img)
+        return _tess_api.GetUTF8Text()
+    return pytesseract.image_to_string(img)
+
+
+def ocr_pdf_pages(pages: List[fitz.Page]) -> List[str]:
+    """OCR already-loaded pages of an open PDF.
+
+    Pages are rendered as single-channel grayscale, which is all Tesseract uses.
+
+    With tesserocr the pages are OCRed in memory by the persistent API. Otherwise
+    they are rendered to PNGs in a temp dir and passed to a single tesseract run
+    as one image list, so the engine and language model load once per PDF
+    instead of once per page. Tesseract ends each image's text with a form feed,
+    which splits the output back into pages.
+    """
+    if TESSEROCR_AVAILABLE:
+        # the in-process API has no startup cost to amortize; OCR from memory
+        texts = []
+        for n, page in enumerate(pages, 1):
+            pix = page.get_pixmap(dpi=200, colorspace=fitz.csGRAY)
+            img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            # drop the pixmap before OCR so only one page buffer is alive at a time
+            del pix
+            texts.append(ocr_image(img))
+            del img
+            if n % STORE_SHRINK_EVERY == 0:
+                fitz.TOOLS.store_shrink(100)
+        return texts
+
+    with tempfile.TemporaryDirectory(prefix='jsg_ocr_') as tmp_dir:
+        paths = []
+        for n, page in enumerate(pages, 1):
+            path = os.path.join(tmp_dir, f'page_{page.number+1}.png')
+            page.get_pixmap(dpi=200, colorspace=fitz.csGRAY).save(path)
+            paths.append(path)
+            if n % STORE_SHRINK_EVERY == 0:
+                fitz.TOOLS.store_shrink(100)
+        list_path = os.path.join(tmp_dir, 'pages.txt')
+        with open(list_path, 'w', encoding='utf-8') as fh:
+            fh.write('\n'.join(paths) + '\n')
+        texts = pytesseract.image_to_string(list_path).split('\f')
+        if len(texts) < len(paths) or any(t.strip() for t in texts[len(paths):]):
+            # output doesn't line up with the pages; OCR them one at a time
+            texts = [ocr_image(Image.open(p)) for p in paths]
+    return texts[:len(paths)]
+
 
 def extract_text_from_pdf(pdf_path: str) -> List[dict]:
-    doc = fitz.open(pdf_path)
     results = []
-    for i in range(len(doc)):
-        # try to get selectable text
-        text = doc.get_page_text(i)
-        if text and text.strip():
+    with fitz.open(pdf_path) as doc:
+        # each page is loaded once; pages without selectable text are kept for OCR
+        ocr_pages = []
+        for i, page in enumerate(doc):
+            # try to get selectable text
+            text = page.get_text()
             results.append({
                 'source_file': os.path.basename(pdf_path),
                 'page': i+1,
                 'photo_file_name': '',
-                'raw_text': text.strip()
+                'raw_text': text.strip() if text else ''
             })
-        else:
-            # fallback to rendering page to image and OCR if available
-            if OCR_AVAILABLE:
-                pix = doc.load_page(i).get_pixmap(dpi=200)
-                img_data = pix.tobytes()
-                # write to temp and run OCR
-                import tempfile
-                ext = 'png'
-                with tempfile.NamedTemporaryFile(suffix='.'+ext, delete=False) as tmp:
-                    tmp.write(img_data)
-                    tmp_path = tmp.name
-                try:
-                    ocr_text = pytesseract.image_to_string(Image.open(tmp_path))
-                finally:
-                    try:
-                        os.unlink(tmp_path)
-                    except Exception:
-                        pass
-                results.append({
-                    'source_file': os.path.basename(pdf_path),
-                    'page': i+1,
-                    'photo_file_name': '',
-                    'raw_text': ocr_text.strip()
-                })
-            else:
-                results.append({
-                    'source_file': os.path.basename(pdf_path),
-                    'page': i+1,
-                    'photo_file_name': '',
-                    'raw_text': ''
-                })
+            # blank pages are never rasterized; their raw_text stays empty
+            if OCR_AVAILABLE and not results[-1]['raw_text'] and page_has_ink(page):
+                ocr_pages.append(page)
+
+        # fallback to rendering pages without selectable text and OCR them in one batch
+        if ocr_pages:
+            for page, ocr_text in zip(ocr_pages, ocr_pdf_pages(ocr_pages)):
+                results[page.number]['raw_text'] = ocr_text.strip()
     return results
 
 
 def extract_text_from_image(image_path: str) -> dict:
     if not OCR_AVAILABLE:
         return {'source_file': os.path.basename(image_path), 'page': 0, 'photo_file_name': os.path.basename(image_path), 'raw_text': ''}
-    # use OpenCV to load and possibly preprocess
-    img = Image.open(image_path)
-    # optional preprocessing: convert to grayscale
-    try:
-        gray = img.convert('L')
-        text = pytesseract.image_to_string(gray)
-    except Exception:
-        text = pytesseract.image_to_string(img)
+    # use OpenCV to load and possibly preprocess: decode straight to grayscale
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is not None:
+        text = ocr_image(Image.fromarray(gray))
+    else:
+        # OpenCV can't read it (format or path); let PIL decode and convert
+        img = Image.open(image_path)
+        try:
+            gray = img.convert('L')
+            text = ocr_image(gray)
+        except Exception:
+            text = ocr_image(img)
     return {'source_file': os.path.basename(image_path), 'page': 0, 'photo_file_name': os.path.basename(image_path), 'raw_text': text.strip()}
 
 
-def main(input_dir: str, out_csv: str, recursive: bool = False):
+def extract_file(path: str) -> List[dict]:
+    """Return the extracted-text rows for one PDF or image file."""
+    if path.lower().endswith('.pdf'):
+        return extract_text_from_pdf(path)
+    return [extract_text_from_image(path)]
+
+
+def main(input_dir: str, out_csv: str, recursive: bool = False, workers: Optional[int] = None):
     os.makedirs(os.path.dirname(out_csv) or '.', exist_ok=True)
-    entries = []
+    paths = []
     if recursive:
         for root, dirs, files in os.walk(input_dir):
             for f in files:
-                path = os.path.join(root, f)
-                if f.lower().endswith('.pdf'):
-                    entries.extend(extract_text_from_pdf(path))
-                elif f.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    entries.append(extract_text_from_image(path))
+                if f.lower().endswith(SUPPORTED_EXTENSIONS):
+                    paths.append(os.path.join(root, f))
     else:
-        for f in os.listdir(input_dir):
-            path = os.path.join(input_dir, f)
-            if f.lower().endswith('.pdf'):
-                entries.extend(extract_text_from_pdf(path))
-            elif f.lower().endswith(('.png', '.jpg', '.jpeg')):
-                entries.append(extract_text_from_image(path))
+        # scandir entries carry their own path and file type, no extra stat per file
+        with os.scandir(input_dir) as it:
+            for entry in it:
+                if entry.name.lower().endswith(SUPPORTED_EXTENSIONS) and entry.is_file():
+                    paths.append(entry.path)
 
-    # write CSV
-    with open(out_csv, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=['source_file', 'page', 'photo_file_name', 'raw_text'])
-        writer.writeheader()
-        for e in entries:
-            writer.writerow(e)
+    # Files are extracted in worker processes; map keeps the input order and
+    # each file's rows are written as soon as they come back
+    count = 0
+    with open(out_csv, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['source_file', 'page', 'photo_file_name', 'raw_text'])
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=init_ocr_worker) as executor:
+            for rows in executor.map(extract_file, paths):
+                writer.writerows(
+                    (e['source_file'], e['page'], e['photo_file_name'], e['raw_text'])
+                    for e in rows
+                )
+                count += len(rows)
 
-    print(f"Wrote {len(entries)} extracted-text rows to {out_csv}")
+    print(f"Wrote {count} extracted-text rows to {out_csv}")
 
 
 if __name__ == '__main__':
@@ -124,5 +191,7 @@ if __name__ == '__main__':
     parser.add_argument('--input-dir', default='input', help='Input directory containing PDFs/images')
     parser.add_argument('--out-csv', default='output/extracted_text.csv', help='CSV path to write extracted text')
     parser.add_argument('--recursive', action='store_true', help='Recursively search input dir')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of extraction worker processes (default: CPU count)')
     args = parser.parse_args()
-    main(args.input_dir, args.out_csv, args.recursive)
+    main(args.input_dir, args.out_csv, args.recursive, args.workers)
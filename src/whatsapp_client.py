@@ -1,7 +1,18 @@
 import os
+import hashlib
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
 
 load_dotenv()
 
@@ -11,6 +22,15 @@ WHATSAPP_API_VERSION = os.getenv("WHATSAPP_API_VERSION", "v21.0")
 
 BASE_URL = f"https://graph.facebook.com/{WHATSAPP_API_VERSION}"
 
+# Keep-alive connections shared by concurrent sends; sized above WHATSAPP_SEND_WORKERS
+HTTP_POOL_SIZE = 16
+# Sends are POSTs that WhatsApp may already have accepted when a reply is lost or a
+# gateway errors out, so those are never replayed. Only failed connects and 429
+# rejections (waiting out Retry-After) are retried.
+HTTP_RETRY = Retry(total=3, connect=3, read=0, other=0, backoff_factor=0.5,
+                   status_forcelist=(429,), allowed_methods=None,
+                   respect_retry_after_header=True, raise_on_status=False)
+
 class WhatsAppClient:
     def __init__(self, token: Optional[str] = None, phone_number_id: Optional[str] = None):
         self.token = token or WHATSAPP_TOKEN
@@ -20,24 +40,48 @@ class WhatsAppClient:
         self.headers = {
             "Authorization": f"Bearer {self.token}"
         }
+        # One session for all calls so TLS connections are reused
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE,
+                                                   max_retries=HTTP_RETRY))
+        # media ids of files already uploaded by this client, keyed by content digest
+        self._media_cache: Dict[str, str] = {}
+
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        """Content hash of a file, used to key the media cache."""
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fh:
+            while chunk := fh.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
 
     def upload_media(self, image_path: str) -> Optional[str]:
-        """Upload an image to WhatsApp Cloud API /media endpoint and return media id on success."""
+        """Upload an image to WhatsApp Cloud API /media endpoint and return media id on success.
+
+        Identical file contents are uploaded once per client; later calls reuse the media id.
+        """
         url = f"{BASE_URL}/{self.phone_number_id}/media"
-        files = {"file": open(image_path, "rb")}
+        mime_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        resp = None
         try:
-            resp = requests.post(url, headers=self.headers, files=files)
+            digest = self._file_digest(image_path)
+            media_id = self._media_cache.get(digest)
+            if media_id:
+                return media_id
+            with open(image_path, "rb") as fh:
+                files = {"file": (os.path.basename(image_path), fh, mime_type)}
+                data = {"messaging_product": "whatsapp", "type": mime_type}
+                resp = self.session.post(url, data=data, files=files)
             resp.raise_for_status()
-            data = resp.json()
-            return data.get("id")
+            media_id = resp.json().get("id")
+            if media_id:
+                self._media_cache[digest] = media_id
+            return media_id
         except Exception as e:
             print(f"Failed to upload media: {e} | response: {getattr(resp, 'text', None)}")
             return None
-        finally:
-            try:
-                files['file'].close()
-            except Exception:
-                pass
 
     def send_image_message(self, to_whatsapp_number: str, media_id: str, caption: str) -> bool:
         """Send an image message with caption to a WhatsApp number using media_id."""
@@ -51,10 +95,26 @@ class WhatsAppClient:
                 "caption": caption
             }
         }
+        resp = None
         try:
-            resp = requests.post(url, headers={**self.headers, "Content-Type": "application/json"}, json=payload)
+            if ORJSON_AVAILABLE:
+                # orjson encodes in C; the bytes are posted as-is
+                resp = self.session.post(url, data=orjson.dumps(payload),
+                                         headers={"Content-Type": "application/json"})
+            else:
+                resp = self.session.post(url, json=payload)
             resp.raise_for_status()
             return True
         except Exception as e:
             print(f"Failed to send WhatsApp message to {to_whatsapp_number}: {e} | response: {getattr(resp, 'text', None)}")
             return False
+
+    def broadcast(self, messages: Iterable[Tuple[str, str, str]],
+                  max_workers: Optional[int] = None) -> List[bool]:
+        """Send many (to_whatsapp_number, media_id, caption) image messages concurrently.
+
+        Sends overlap on a thread pool sharing the session's keep-alive connections.
+        Returns one success flag per message, in input order.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or HTTP_POOL_SIZE) as executor:
+            return list(executor.map(lambda message: self.send_image_message(*message), messages))